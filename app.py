@@ -1,39 +1,112 @@
+import base64
 import boto3
+import functools
+import hashlib
+import heapq
+import hmac
+import operator
+import orjson
 import os
-import uuid
+import redis
 import time
-import json
-import traceback
+import threading
 import logging
 
-from flask import Flask, jsonify, request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from flask import (Flask, Response, g, jsonify, request,
+                   stream_with_context)
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from boto3.dynamodb.conditions import Attr
-from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+from botocore.exceptions import (ClientError, ConnectionClosedError,
+                                 ReadTimeoutError)
 
 # --- Configure Logging ---
-logging.basicConfig(level=logging.INFO,
+# Routine per-request lines are logged at DEBUG; production pods run at
+# WARNING (set via LOG_LEVEL) so hot-path requests do no formatting or
+# stderr writes at all.
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
                     format='%(asctime)s - %(levelname)s - %(message)s',
                     datefmt='%Y-%m-%d %H:%M:%S')
 
+# --- JSON Serialization ---
+# orjson is a C-implemented JSON library, several times faster than the
+# stdlib json that Flask's jsonify uses by default. Registering it as
+# the app's JSON provider speeds up every response we serialize.
+
+
+def _orjson_default(obj):
+    # DynamoDB's resource API returns all numbers as Decimal.
+    if isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        return float(obj)
+    raise TypeError(
+        f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
+
+@app.before_request
+def _stamp_request():
+    # One clock read per request: handlers derive their timestamps from
+    # g.now_ns instead of calling time.time() again, and time_ns avoids
+    # the float conversion.
+    g.now_ns = time.time_ns()
+
+
 logging.info("Flask application starting up... Demo Change")
 
 
 # --- DynamoDB Initialization ---
 DYNAMODB_TABLE_NAME = os.environ.get('DYNAMODB_TABLE_NAME',
                                      'ugp-eks-cicd-messages-table')
+# GSI with a constant partition key ('type') and 'timestamp' as the sort
+# key, so GET can read quotes newest-first without scanning the table.
+DYNAMODB_GSI_NAME = os.environ.get('DYNAMODB_GSI_NAME', 'quote-by-time')
 AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
 
+# Shared HTTP settings for all AWS clients. Connections are pooled and
+# reused across requests so the DynamoDB and Bedrock round-trips don't
+# pay a fresh TLS handshake each time. TCP keep-alive stops idle pooled
+# sockets from being dropped by intermediaries, and adaptive retries
+# back off automatically when DynamoDB or Bedrock throttle us.
+_BOTO_CONFIG = Config(
+    region_name=AWS_REGION,
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+)
+
 logging.info(
     "Initializing DynamoDB resource for table '%s' in region '%s'...",
     DYNAMODB_TABLE_NAME, AWS_REGION
 )
 try:
-    dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
+    dynamodb = boto3.resource('dynamodb', config=_BOTO_CONFIG)
     table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+    # Low-level client for the hot reaction path: it skips the resource
+    # layer's expression builders and per-call (de)serializer objects,
+    # taking pre-built AttributeValue dicts instead.
+    ddb_client = boto3.client('dynamodb', config=_BOTO_CONFIG)
     logging.info("DynamoDB table '%s' resource initialized successfully.",
                  DYNAMODB_TABLE_NAME)
 except Exception as e:
@@ -46,82 +119,584 @@ except Exception as e:
     pass
 
 
-# --- AWS LLM Integration ---
-def generate_quote_with_aws_llm(name, input1, input2, input3):
+_DDB_DESERIALIZER = TypeDeserializer()
+
+
+def _deserialize_item(raw_item):
+    """Converts a low-level AttributeValue map into plain Python."""
+    return {k: _DDB_DESERIALIZER.deserialize(v)
+            for k, v in raw_item.items()}
+
+
+# Pre-built expression fragments and value dicts for the hot paths.
+# botocore only reads these, so the shared objects are safe to pass on
+# every call instead of re-allocating them per request.
+_REACT_UPDATE_EXPR = 'ADD #reactions.#reaction_name :val'
+_REACT_INIT_EXPR = ('SET #reactions = '
+                    'if_not_exists(#reactions, :initial_map)')
+_REACT_ONE = {':val': {'N': '1'}}
+_FEED_PROJECTION = '#i, #n, quote, reactions, #t'
+_FEED_ATTR_NAMES = {'#i': 'id', '#n': 'name', '#t': 'timestamp'}
+_ZERO_REACTIONS = {'laugh': 0, 'love': 0, 'tears': 0, 'sad': 0, 'like': 0,
+                   'downvote': 0, 'report': 0}
+
+
+# --- Bedrock Client Initialization ---
+# The Bedrock client is created once at import time and shared by all
+# requests. Client construction is expensive (endpoint data, signers) and
+# a fresh client per request also meant a fresh TLS handshake per call,
+# so the pooled module-level client shaves that overhead off every POST.
+logging.info("Initializing Bedrock runtime client in region '%s'...",
+             AWS_REGION)
+
+
+def _force_keep_alive(request, **kwargs):
+    """Asks the service to hold the connection open between invokes."""
+    request.headers['Connection'] = 'keep-alive'
+
+
+def _new_bedrock_client():
+    """Builds a pooled bedrock-runtime client with keep-alive forced."""
+    client = boto3.client('bedrock-runtime', config=_BOTO_CONFIG)
+    client.meta.events.register(
+        'request-created.bedrock-runtime', _force_keep_alive)
+    return client
+
+
+def _invoke_bedrock_stream(body, model_id):
     """
-    Generates a funny quote using Amazon Bedrock with the Anthropic Claude 3
-    Sonnet model.
+    Invokes the model on the shared client. If the pooled connection has
+    gone stale (dropped by a NAT/load balancer during an idle period),
+    the client is rebuilt once and the call retried.
     """
-    logging.info("Preparing to invoke AWS Bedrock LLM...")
+    global bedrock_client
     try:
-        bedrock_client = boto3.client(
-            service_name='bedrock-runtime',
-            region_name=AWS_REGION
-        )
-        logging.info("Bedrock client created successfully.")
-
-        prompt = (
-            f"You are a witty desi Gen Z roast master with perfect meme "
-            "timing. Write one short, hilarious roast (max 25 words) about "
-            f"someone named {name}, "
-            f"involving {input1}, {input2}, and {input3}. "
-            "Make it sound like a viral Instagram meme or reel caption — "
-            "sarcastic, visual, and instantly relatable. The humor should be "
-            "sharp but safe, like how friends roast each other in college "
-            "group chats. No vulgarity, no adult jokes, "
-            "no politics, no slurs. "
-            "Use Hinglish. Only output the roast quote. Nothing else."
+        return bedrock_client.invoke_model_with_response_stream(
+            body=body,
+            modelId=model_id,
+            accept='application/json',
+            contentType='application/json'
         )
-        logging.info("Using prompt: '%s'", prompt)
-
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 200,
-            "temperature": 1,
-            "top_k": 50,
-            "top_p": 0.9,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [{"type": "text", "text": prompt}]
-                }
-            ]
-        })
-        model_id = 'anthropic.claude-3-sonnet-20240229-v1:0'
-
-        logging.info("Invoking model '%s'...", model_id)
-
-        response = bedrock_client.invoke_model(
+    except (ConnectionClosedError, ReadTimeoutError) as e:
+        logging.warning("Stale Bedrock connection (%s); rebuilding the "
+                        "client and retrying once.", type(e).__name__)
+        bedrock_client = _new_bedrock_client()
+        return bedrock_client.invoke_model_with_response_stream(
             body=body,
             modelId=model_id,
             accept='application/json',
             contentType='application/json'
         )
 
-        logging.info("Received response from Bedrock LLM. Reading body...")
-        response_body = json.loads(response.get('body').read())
-        logging.debug("Raw response body from Bedrock: %s", response_body)
 
-        if ('content' not in response_body or
-                not response_body['content'] or
-                'text' not in response_body['content'][0]):
+try:
+    bedrock_client = _new_bedrock_client()
+    logging.info("Bedrock runtime client initialized successfully.")
+except Exception as e:
+    logging.fatal("Failed to initialize Bedrock client: %s", e)
+    pass
+
+
+# --- Bedrock Payload Template ---
+# The prompt is split into two content blocks: the fixed roast-master
+# instructions, and a short dynamic tail carrying the four user inputs.
+# The surrounding JSON is serialized once at import time; per call we
+# only JSON-escape the dynamic tail and splice it between the two
+# halves. (The static block is a natural prompt-caching prefix, but the
+# pinned claude-3-sonnet model is not on Bedrock's prompt-caching
+# support list and it is far under the 1024-token caching minimum, so
+# no cache_control marker is sent.)
+_STATIC_PROMPT = (
+    "You are a witty desi Gen Z roast master with perfect meme "
+    "timing. Write one short, hilarious roast (max 25 words) about "
+    "the person described in the next content block. "
+    "Make it sound like a viral Instagram meme or reel caption — "
+    "sarcastic, visual, and instantly relatable. The humor should be "
+    "sharp but safe, like how friends roast each other in college "
+    "group chats. No vulgarity, no adult jokes, no politics, no slurs. "
+    "Use Hinglish. Only output the roast quote. Nothing else."
+)
+
+_PAYLOAD_PREFIX = (
+    b'{"anthropic_version":"bedrock-2023-05-31","max_tokens":200,'
+    b'"temperature":1,"top_k":50,"top_p":0.9,'
+    b'"messages":[{"role":"user","content":[{"type":"text","text":'
+    + orjson.dumps(_STATIC_PROMPT)
+    + b'},{"type":"text","text":"'
+)
+_PAYLOAD_SUFFIX = b'"}]}]}'
+
+
+def _build_bedrock_body(prompt_tail):
+    """JSON-escapes the dynamic prompt tail and splices it into the
+    pre-serialized payload."""
+    return (_PAYLOAD_PREFIX + orjson.dumps(prompt_tail)[1:-1]
+            + _PAYLOAD_SUFFIX)
+
+
+# --- Bedrock Response Cache ---
+# Exact-match LRU cache in front of the LLM: repeated POSTs with the
+# same four inputs (client retries, spam-clicking) reuse the stored
+# roast instead of paying the multi-second Bedrock round-trip again.
+# Only successful generations are cached, and the cache is per worker
+# process.
+_QUOTE_CACHE_SIZE = int(os.environ.get('QUOTE_CACHE_SIZE', '4096'))
+_quote_cache = OrderedDict()
+_quote_cache_lock = threading.Lock()
+
+
+def _quote_cache_key(name, input1, input2, input3):
+    """Normalizes the four prompt inputs into a cache key."""
+    return (name.strip().lower(), input1.strip().lower(),
+            input2.strip().lower(), input3.strip().lower())
+
+
+def _quote_cache_get(key):
+    """Returns the cached quote for key, or None on a miss."""
+    with _quote_cache_lock:
+        quote = _quote_cache.get(key)
+        if quote is not None:
+            _quote_cache.move_to_end(key)
+        return quote
+
+
+def _quote_cache_put(key, quote):
+    """Stores a generated quote, evicting the least recently used."""
+    with _quote_cache_lock:
+        _quote_cache[key] = quote
+        _quote_cache.move_to_end(key)
+        while len(_quote_cache) > _QUOTE_CACHE_SIZE:
+            _quote_cache.popitem(last=False)
+
+
+# --- Feed Cache (Redis) ---
+# Optional ElastiCache/Redis read-through cache for the GET feed. When
+# REDIS_URL is set, each serialized (limit, cursor) page is cached for
+# a few seconds, collapsing the read-heavy anonymous traffic to one
+# DynamoDB query per TTL window across all pods. Writes bump a version
+# counter embedded in the key so new quotes appear immediately. Cache
+# failures are never allowed to fail the request.
+REDIS_URL = os.environ.get('REDIS_URL')
+FEED_CACHE_TTL_SECONDS = int(os.environ.get('FEED_CACHE_TTL_SECONDS', '5'))
+_FEED_VERSION_KEY = 'messages:feed:version'
+
+redis_client = None
+if REDIS_URL:
+    logging.info("Initializing Redis feed cache client...")
+    try:
+        redis_client = redis.Redis.from_url(
+            REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+        logging.info("Redis feed cache client initialized successfully.")
+    except Exception as e:
+        logging.error("Failed to initialize Redis client: %s", e)
+
+
+def _feed_cache_key(limit, cursor):
+    """Builds the versioned cache key for one page of the feed."""
+    version = redis_client.get(_FEED_VERSION_KEY) or b'0'
+    return f"messages:feed:{version.decode()}:{limit}:{cursor or ''}"
+
+
+def _feed_cache_get(limit, cursor):
+    """Returns the cached serialized page, or None."""
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.get(_feed_cache_key(limit, cursor))
+    except Exception as e:
+        logging.warning("Redis feed cache read failed: %s", e)
+        return None
+
+
+def _feed_cache_put(limit, cursor, body):
+    """Stores a serialized page with a short TTL."""
+    if redis_client is None:
+        return
+    try:
+        redis_client.set(_feed_cache_key(limit, cursor), body,
+                         ex=FEED_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logging.warning("Redis feed cache write failed: %s", e)
+
+
+def _feed_cache_invalidate():
+    """Drops local pages and bumps the shared feed version."""
+    _local_feed_clear()
+    if redis_client is None:
+        return
+    try:
+        redis_client.incr(_FEED_VERSION_KEY)
+    except Exception as e:
+        logging.warning("Redis feed cache invalidation failed: %s", e)
+
+
+# --- Feed Cache (in-process) ---
+# Short-TTL per-worker cache of the serialized feed pages, sitting in
+# front of the optional Redis tier. It collapses thundering-herd reads
+# to one DynamoDB query per TTL window per worker, and the ETag lets
+# polling clients get a 304 Not Modified instead of a body. The cache
+# is size-bounded: the key includes the client-supplied cursor, so
+# without a cap a flood of unique cursors would grow worker memory
+# without bound. Only the first few pages are worth caching anyway.
+_LOCAL_FEED_TTL_SECONDS = float(
+    os.environ.get('FEED_LOCAL_CACHE_TTL_SECONDS', '2'))
+_LOCAL_FEED_CACHE_SIZE = int(
+    os.environ.get('FEED_LOCAL_CACHE_SIZE', '8'))
+_local_feed_cache = OrderedDict()
+_local_feed_lock = threading.Lock()
+
+
+def _feed_etag(body):
+    """Strong ETag for a serialized feed page."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _local_feed_get(key):
+    """Returns (body, etag) for a fresh cached page, or None."""
+    with _local_feed_lock:
+        entry = _local_feed_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, body, etag = entry
+        if expires_at < time.time():
+            del _local_feed_cache[key]
+            return None
+        return body, etag
+
+
+def _local_feed_put(key, body, etag):
+    """Caches a serialized page for the local TTL window, expiring
+    stale entries from the front and evicting the oldest once the size
+    bound is reached."""
+    now = time.time()
+    with _local_feed_lock:
+        while _local_feed_cache:
+            oldest = next(iter(_local_feed_cache))
+            if _local_feed_cache[oldest][0] >= now:
+                break
+            del _local_feed_cache[oldest]
+        _local_feed_cache.pop(key, None)
+        while len(_local_feed_cache) >= _LOCAL_FEED_CACHE_SIZE:
+            _local_feed_cache.popitem(last=False)
+        _local_feed_cache[key] = (
+            now + _LOCAL_FEED_TTL_SECONDS, body, etag)
+
+
+def _local_feed_clear():
+    """Drops every locally cached page (called on writes)."""
+    with _local_feed_lock:
+        _local_feed_cache.clear()
+
+
+# --- ID Generation ---
+# ULID-style ids: a 48-bit millisecond timestamp prefix followed by 80
+# random bits, hex-encoded (26 chars vs uuid4's 36). One clock read and
+# one urandom read per id instead of uuid4's UUID-object construction,
+# and ids sort chronologically so they cluster writes by time.
+
+
+def _new_quote_id():
+    """Returns a 32-character, URL-safe, time-sortable id: 12 hex
+    chars of millisecond timestamp plus 20 hex chars of randomness."""
+    millis = time.time_ns() // 1_000_000
+    return f"{millis & 0xffffffffffff:012x}{os.urandom(10).hex()}"
+
+
+# --- Recent-Post Dedupe ---
+# Client retries of the same POST (flaky networks, double taps) used to
+# create duplicate items and duplicate Bedrock spend. The four inputs
+# are hashed with blake2b (C-implemented in CPython) and recent hashes
+# map to the already-stored quote for a short window, so a retry gets
+# the original response back instead of a second item.
+_DEDUPE_TTL_SECONDS = int(os.environ.get('POST_DEDUPE_TTL_SECONDS', '300'))
+_recent_posts = OrderedDict()
+_recent_posts_lock = threading.Lock()
+
+
+def _content_hash(name, input1, input2, input3):
+    """Hashes the four prompt inputs into a 128-bit hex digest."""
+    raw = f"{name}|{input1}|{input2}|{input3}".encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _recent_post_get(content_hash):
+    """Returns the stored response for a recent duplicate, or None."""
+    with _recent_posts_lock:
+        entry = _recent_posts.get(content_hash)
+        if entry is None:
+            return None
+        expires_at, stored = entry
+        if expires_at < time.time():
+            del _recent_posts[content_hash]
+            return None
+        return stored
+
+
+def _recent_post_put(content_hash, stored):
+    """Records a stored quote, expiring stale entries from the front."""
+    now = time.time()
+    with _recent_posts_lock:
+        while _recent_posts:
+            oldest = next(iter(_recent_posts))
+            if _recent_posts[oldest][0] >= now:
+                break
+            del _recent_posts[oldest]
+        _recent_posts[content_hash] = (now + _DEDUPE_TTL_SECONDS, stored)
+
+
+# --- Background Write Pool ---
+# The DynamoDB write that follows quote generation is fired on a small
+# thread pool (greenlets under the gevent workers) so the 201 response
+# is not delayed by the put_item round-trip. Feed-cache invalidation
+# and dedupe recording run in the completion callback, i.e. only after
+# the write actually succeeded.
+_io_pool = ThreadPoolExecutor(max_workers=16)
+
+
+def _after_quote_put(future, quote_id, content_hash, stored):
+    """Completion hook for background quote writes."""
+    exc = future.exception()
+    if exc is not None:
+        logging.error("Background put_item for quote '%s' failed: %s",
+                      quote_id, exc)
+        return
+    logging.debug("Quote '%s' successfully stored in DynamoDB.", quote_id)
+    _feed_cache_invalidate()
+    _recent_post_put(content_hash, stored)
+
+
+# --- Request Validation ---
+# Required POST fields, validated in a single pass. Fields are checked
+# explicitly for being non-empty strings rather than for truthiness, so
+# legitimate falsy-looking values like "0" are accepted.
+_REQUIRED_QUOTE_FIELDS = ('name', 'input1', 'input2', 'input3')
+
+# Reaction names the react endpoint accepts. Anything else is rejected
+# before the DynamoDB round-trip, which also stops arbitrary client-
+# supplied keys from growing the reactions map (and the item size, and
+# every feed response) without bound.
+_ALLOWED_REACTIONS = frozenset({'laugh', 'love', 'tears', 'sad', 'like',
+                                'downvote', 'report'})
+
+
+def _parse_quote_request(data):
+    """
+    Validates a quote POST payload and returns the four prompt inputs.
+    Raises ValueError naming the first invalid or missing field.
+    """
+    values = []
+    for field in _REQUIRED_QUOTE_FIELDS:
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(field)
+        values.append(value)
+    return values
+
+
+# Largest batch a single /messages/bulk request may submit, so one
+# request can't queue an unbounded import.
+_MAX_BULK_ITEMS = int(os.environ.get('MAX_BULK_ITEMS', '500'))
+
+# Shared secret for the internal bulk-import endpoint. The endpoint is
+# disabled (404) unless this is set, and enabled pods require callers
+# to present it in the X-Bulk-Import-Token header — the app is public
+# and unauthenticated otherwise, and bulk writes should only come from
+# migration jobs, never browsers.
+_BULK_IMPORT_TOKEN = os.environ.get('BULK_IMPORT_TOKEN')
+
+
+def _bulk_import_authorized():
+    """True when the request carries the configured bulk-import token."""
+    if not _BULK_IMPORT_TOKEN:
+        return False
+    supplied = request.headers.get('X-Bulk-Import-Token', '')
+    return hmac.compare_digest(supplied, _BULK_IMPORT_TOKEN)
+
+
+def _parse_bulk_entry(entry, default_timestamp):
+    """
+    Validates one /messages/bulk entry and returns the DynamoDB item to
+    store. Raises ValueError with a client-facing message. Fields get
+    the same non-empty-string check as _parse_quote_request, so values
+    like "0" are accepted and non-strings are not.
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("Each item must be an object")
+    for field in ('name', 'quote'):
+        value = entry.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Each item requires a non-empty '{field}'")
+    timestamp = entry.get('timestamp', default_timestamp)
+    if isinstance(timestamp, bool) or not isinstance(timestamp, int):
+        raise ValueError("'timestamp' must be an integer")
+    return {
+        'id': _new_quote_id(),
+        'name': entry['name'],
+        'quote': entry['quote'],
+        'type': 'quote',
+        'timestamp': timestamp,
+        'reactions': dict(_ZERO_REACTIONS)
+    }
+
+
+# --- Legacy Scan Fallback ---
+# Parallel segmented scan for tables provisioned before the GSI
+# existed. DynamoDB partitions the scan into SCAN_SEGMENTS independent
+# segments which are read concurrently, so a full-table read costs
+# roughly 1/N of the single-threaded latency. Each segment follows
+# LastEvaluatedKey to completion. Keep SCAN_SEGMENTS below
+# max_pool_connections on the shared client config.
+_SCAN_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '8'))
+
+
+def _scan_quote_segment(segment):
+    """Scans one parallel segment of the table to completion."""
+    items = []
+    scan_kwargs = {
+        'TotalSegments': _SCAN_SEGMENTS,
+        'Segment': segment,
+        'FilterExpression': Attr('quote').exists(),
+        'ProjectionExpression': _FEED_PROJECTION,
+        'ExpressionAttributeNames': _FEED_ATTR_NAMES
+    }
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items
+
+
+# --- Pagination Helpers ---
+# Largest page a single GET /messages may request; also the default.
+_MAX_PAGE_LIMIT = 100
+
+# Keys a valid cursor must carry: the table key plus both GSI keys.
+_CURSOR_KEYS = frozenset({'id', 'type', 'timestamp'})
+
+
+def _encode_cursor(last_evaluated_key):
+    """
+    Packs DynamoDB's LastEvaluatedKey into an opaque URL-safe cursor
+    string that clients can echo back via the 'cursor' query parameter.
+    """
+    key = {k: int(v) if isinstance(v, Decimal) else v
+           for k, v in last_evaluated_key.items()}
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode()
+
+
+def _decode_cursor(cursor):
+    """
+    Unpacks a cursor produced by _encode_cursor. Raises ValueError for
+    anything that was not produced by _encode_cursor, so a tampered
+    cursor is rejected up front instead of being passed to DynamoDB as
+    a malformed ExclusiveStartKey.
+    """
+    try:
+        key = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, UnicodeEncodeError):
+        raise ValueError('malformed cursor')
+    if not isinstance(key, dict) or set(key) != _CURSOR_KEYS:
+        raise ValueError('malformed cursor')
+    # Value types matter too: a wrong-typed key reaches DynamoDB as a
+    # malformed ExclusiveStartKey and errors there instead of here.
+    if not (isinstance(key['id'], str) and isinstance(key['type'], str)
+            and isinstance(key['timestamp'], int)
+            and not isinstance(key['timestamp'], bool)):
+        raise ValueError('malformed cursor')
+    return key
+
+
+def _is_missing_index_error(error):
+    """
+    True when a ClientError from table.query means the quote-by-time
+    GSI does not exist on this table (the only case where the legacy
+    scan fallback applies). Every other ClientError — throttling,
+    malformed request, missing table — should surface instead of
+    silently triggering a full-table scan.
+    """
+    err = error.response.get('Error', {})
+    return (err.get('Code') == 'ValidationException'
+            and 'index' in err.get('Message', '').lower())
+
+
+# --- AWS LLM Integration ---
+def _build_prompt_tail(name, input1, input2, input3):
+    """Builds the dynamic prompt block carrying the four user inputs."""
+    return (f"Roast someone named {name}, "
+            f"involving {input1}, {input2}, and {input3}.")
+
+
+def _stream_quote_deltas(prompt_tail):
+    """
+    Invokes the model with response streaming and yields the text
+    deltas as they arrive. The streaming API starts returning tokens as
+    soon as the model produces them instead of buffering the full
+    completion on the Bedrock side, so generation overlaps with the
+    network transfer.
+    """
+    body = _build_bedrock_body(prompt_tail)
+    model_id = 'anthropic.claude-3-sonnet-20240229-v1:0'
+
+    logging.debug("Invoking model '%s' with response streaming...",
+                  model_id)
+    response = _invoke_bedrock_stream(body, model_id)
+
+    logging.debug("Streaming response chunks from Bedrock LLM...")
+    for event in response.get('body'):
+        chunk = orjson.loads(event['chunk']['bytes'])
+        if chunk.get('type') == 'content_block_delta':
+            text = chunk['delta'].get('text', '')
+            if text:
+                yield text
+
+
+# Prefix shared by the canned fallbacks generate_quote_with_aws_llm
+# returns on failure. Callers use it to tell a real roast from an
+# error message: fallbacks are never stored, cached, or dedupe-
+# recorded, so a client retry gets a fresh generation attempt instead
+# of the error replayed at it.
+_ERROR_QUOTE_PREFIX = 'Could not generate a quote.'
+
+
+def generate_quote_with_aws_llm(name, input1, input2, input3):
+    """
+    Generates a funny quote using Amazon Bedrock with the Anthropic Claude 3
+    Sonnet model.
+    """
+    cache_key = _quote_cache_key(name, input1, input2, input3)
+    cached_quote = _quote_cache_get(cache_key)
+    if cached_quote is not None:
+        logging.debug("Quote cache hit; skipping Bedrock invocation.")
+        return cached_quote
+
+    logging.debug("Preparing to invoke AWS Bedrock LLM...")
+    try:
+        prompt_tail = _build_prompt_tail(name, input1, input2, input3)
+        logging.debug("Using prompt tail: '%s'", prompt_tail)
+
+        chunks = list(_stream_quote_deltas(prompt_tail))
+
+        if not chunks:
             logging.error("Unexpected response structure from Bedrock. "
-                          "Content field is missing or malformed.")
-            return "Could not generate a quote. Unexpected LLM response."
+                          "No text deltas were streamed.")
+            return _ERROR_QUOTE_PREFIX + ' Unexpected LLM response.'
 
-        generated_quote = response_body['content'][0]['text']
-        logging.info("Successfully generated quote: '%s'", generated_quote)
+        generated_quote = ''.join(chunks)
+        logging.debug("Successfully generated quote: '%s'", generated_quote)
 
+        _quote_cache_put(cache_key, generated_quote)
         return generated_quote
 
     except ClientError as e:
-        logging.error("AWS ClientError when invoking Bedrock LLM: %s", e)
-        traceback.print_exc()
-        return "Could not generate a quote. An AWS client error occurred."
+        logging.exception("AWS ClientError when invoking Bedrock LLM: %s",
+                          e)
+        return _ERROR_QUOTE_PREFIX + ' An AWS client error occurred.'
     except Exception as e:
-        logging.error("Unhandled exception when invoking Bedrock LLM: %s", e)
-        traceback.print_exc()
-        return "Could not generate a quote. The LLM is unavailable."
+        logging.exception("Unhandled exception when invoking Bedrock "
+                          "LLM: %s", e)
+        return _ERROR_QUOTE_PREFIX + ' The LLM is unavailable.'
 
 
 @app.route('/messages', methods=['GET', 'POST'])
@@ -129,19 +704,97 @@ def handle_quotes():
     """
     Handles both GET and POST requests for quotes.
     """
-    logging.info(f"Received {request.method} request for /messages")
+    logging.debug("Received %s request for /messages", request.method)
     if request.method == 'GET':
         try:
-            logging.info("Scanning DynamoDB for quotes...")
-            # In a real app, you would want to use pagination
-            # for large datasets
-            response = table.scan(
-                FilterExpression=Attr('quote').exists()
-            )
+            limit = int(request.args.get('limit', _MAX_PAGE_LIMIT))
+        except ValueError:
+            return jsonify(error="'limit' must be an integer"), 400
+        if not 1 <= limit <= _MAX_PAGE_LIMIT:
+            return jsonify(
+                error=f"'limit' must be between 1 and {_MAX_PAGE_LIMIT}"
+            ), 400
+        cursor = request.args.get('cursor')
+        exclusive_start = None
+        if cursor:
+            try:
+                exclusive_start = _decode_cursor(cursor)
+            except ValueError:
+                return jsonify(error="Invalid 'cursor' parameter"), 400
+        try:
+            next_cursor = None
+
+            cache_key = (limit, cursor)
+
+            def respond(body, etag):
+                # Polling clients that already hold this exact page get
+                # a bodyless 304 instead of the full payload.
+                if request.headers.get('If-None-Match') == etag:
+                    return '', 304
+                return app.response_class(body,
+                                          mimetype='application/json',
+                                          headers={'ETag': etag})
+
+            local_hit = _local_feed_get(cache_key)
+            if local_hit is not None:
+                logging.debug("Local feed cache hit for GET /messages.")
+                return respond(*local_hit)
+
+            cached_page = _feed_cache_get(limit, cursor)
+            if cached_page is not None:
+                logging.debug("Redis feed cache hit for GET /messages.")
+                etag = _feed_etag(cached_page)
+                _local_feed_put(cache_key, cached_page, etag)
+                return respond(cached_page, etag)
+            try:
+                # Index-ordered read: DynamoDB returns the newest quotes
+                # first and only charges for the items actually returned.
+                logging.debug("Querying GSI '%s' for quotes...",
+                              DYNAMODB_GSI_NAME)
+                # Only fetch the attributes the response actually uses;
+                # anything else (prompt inputs etc.) is wasted bandwidth
+                # and decode work.
+                query_kwargs = {
+                    'IndexName': DYNAMODB_GSI_NAME,
+                    'KeyConditionExpression': Key('type').eq('quote'),
+                    'ScanIndexForward': False,
+                    'Limit': limit,
+                    'ProjectionExpression': _FEED_PROJECTION,
+                    'ExpressionAttributeNames': _FEED_ATTR_NAMES
+                }
+                if exclusive_start is not None:
+                    query_kwargs['ExclusiveStartKey'] = exclusive_start
+                response = table.query(**query_kwargs)
+                sorted_items = response.get('Items', [])
+                if 'LastEvaluatedKey' in response:
+                    next_cursor = _encode_cursor(
+                        response['LastEvaluatedKey'])
+            except ClientError as e:
+                # Tables provisioned before the GSI existed fall back to
+                # the legacy scan plus client-side sort. The scan follows
+                # LastEvaluatedKey so results are no longer silently
+                # truncated at DynamoDB's 1 MB page size. Any other
+                # query failure is a real error, not a reason to pay for
+                # a full-table scan.
+                if not _is_missing_index_error(e):
+                    raise
+                logging.warning("GSI '%s' is missing; falling back to "
+                                "full table scan.", DYNAMODB_GSI_NAME)
+                with ThreadPoolExecutor(
+                        max_workers=_SCAN_SEGMENTS) as pool:
+                    segment_items = pool.map(_scan_quote_segment,
+                                             range(_SCAN_SEGMENTS))
+                # nlargest keeps a limit-sized heap (O(M log k))
+                # instead of sorting the full scan result; itemgetter
+                # is C-implemented, and items without a timestamp are
+                # dropped rather than defaulted.
+                sorted_items = heapq.nlargest(
+                    limit,
+                    (i for seg in segment_items for i in seg
+                     if 'timestamp' in i),
+                    key=operator.itemgetter('timestamp'))
+
             quotes = []
-            sorted_items = sorted(response.get('Items', []),
-                                  key=lambda x: x.get('timestamp', 0),
-                                  reverse=True)
 
             for item in sorted_items:
                 # Include the reactions field in the response
@@ -151,15 +804,19 @@ def handle_quotes():
                     "quote": item.get("quote", "No quote provided"),
                     "reactions": item.get("reactions", {})
                 })
-            logging.info("Retrieved %s quotes from DynamoDB.", len(quotes))
-            return jsonify(quotes), 200
+            logging.debug("Retrieved %s quotes from DynamoDB.", len(quotes))
+            body = orjson.dumps({'items': quotes, 'next': next_cursor},
+                                default=_orjson_default)
+            etag = _feed_etag(body)
+            _local_feed_put(cache_key, body, etag)
+            _feed_cache_put(limit, cursor, body)
+            return respond(body, etag)
         except Exception as e:
-            logging.error("Error fetching quotes from DynamoDB: %s", e)
-            traceback.print_exc()
+            logging.exception("Error fetching quotes from DynamoDB: %s", e)
             return jsonify(error="Failed to retrieve quotes"), 500
 
     elif request.method == 'POST':
-        logging.info("Processing POST request for new quote.")
+        logging.debug("Processing POST request for new quote.")
 
         try:
             if not request.is_json:
@@ -168,40 +825,67 @@ def handle_quotes():
 
             data = request.get_json()
             logging.debug("Received JSON payload: %s", data)
-            name = data.get('name')
-            input1 = data.get('input1')
-            input2 = data.get('input2')
-            input3 = data.get('input3')
-
-            if not all([name, input1, input2, input3]):
-                logging.warning("Missing required fields in POST request. "
-                                "Returning 400.")
+            try:
+                name, input1, input2, input3 = _parse_quote_request(data)
+            except ValueError as bad_field:
+                logging.warning("Invalid or missing field '%s' in POST "
+                                "request. Returning 400.", bad_field)
                 return jsonify(error="All fields (name, input1, input2, "
-                                     "input3) are required"), 400
+                                     "input3) are required non-empty "
+                                     "strings"), 400
 
-            logging.info("Initiating LLM quote generation...")
+            content_hash = _content_hash(name, input1, input2, input3)
+            duplicate = _recent_post_get(content_hash)
+            if duplicate is not None:
+                logging.debug("Duplicate POST for hash '%s'; returning "
+                              "the stored quote.", content_hash)
+                return jsonify(
+                    id=duplicate['id'],
+                    name=duplicate['name'],
+                    quote=duplicate['quote'],
+                    message="Quote generated and posted successfully"
+                ), 201
+
+            # Generate the item identity up front so the only work left
+            # after the (multi-second) LLM call is the DynamoDB write.
+            quote_id = _new_quote_id()
+            current_timestamp = g.now_ns // 1_000_000_000
+
+            logging.debug("Initiating LLM quote generation...")
             generated_quote = generate_quote_with_aws_llm(
                 name, input1, input2, input3)
 
-            quote_id = str(uuid.uuid4())
-            current_timestamp = int(time.time())
+            if generated_quote.startswith(_ERROR_QUOTE_PREFIX):
+                # Don't persist the canned fallback as a feed item or
+                # record it for dedupe — a retry should reach Bedrock
+                # again, not get the error replayed for the TTL window.
+                logging.warning("Quote generation failed; nothing "
+                                "stored. Returning 503.")
+                return jsonify(error=generated_quote), 503
 
             item = {
                 'id': quote_id,
                 'name': name,
                 'quote': generated_quote,
+                # Constant partition key for the 'quote-by-time' GSI so
+                # GET can Query instead of Scan.
+                'type': 'quote',
                 'timestamp': current_timestamp,
+                'content_hash': content_hash,
                 # Initialize all reaction counts to 0
-                'reactions': {
-                    'laugh': 0, 'love': 0, 'tears': 0, 'sad': 0, 'like': 0,
-                    'downvote': 0, 'report': 0
-                }
+                'reactions': dict(_ZERO_REACTIONS)
             }
 
-            logging.info("Attempting to store new quote in DynamoDB with "
-                         "ID '%s'...", quote_id)
-            table.put_item(Item=item)
-            logging.info("Quote successfully stored in DynamoDB.")
+            logging.debug("Submitting new quote '%s' for background "
+                          "storage in DynamoDB...", quote_id)
+            put_future = _io_pool.submit(table.put_item, Item=item)
+            put_future.add_done_callback(functools.partial(
+                _after_quote_put,
+                quote_id=quote_id,
+                content_hash=content_hash,
+                stored={'id': quote_id, 'name': name,
+                        'quote': generated_quote}
+            ))
 
             return jsonify(
                 id=quote_id,
@@ -211,18 +895,16 @@ def handle_quotes():
             ), 201
 
         except ClientError as e:
-            logging.error(
+            logging.exception(
                 "DynamoDB ClientError during quote POST request: %s", e
             )
-            traceback.print_exc()
             return jsonify(
                 error="Failed to store quote due to DynamoDB error"
             ), 500
         except Exception as e:
-            logging.error(
+            logging.exception(
                 "Unhandled exception during quote POST request: %s", e
             )
-            traceback.print_exc()
             return jsonify(
                 error="Failed to generate or post quote"
             ), 500
@@ -232,6 +914,180 @@ def handle_quotes():
     return jsonify(error="Method Not Allowed"), 405
 
 
+def _sse_frame(data, event=None):
+    """
+    Frames a payload as one Server-Sent Event. Newlines in the payload
+    become consecutive 'data:' lines (rejoined by the client per the
+    SSE spec); embedding them raw would produce bare continuation lines
+    that clients silently drop.
+    """
+    lines = ''.join(f"data: {line}\n" for line in data.split('\n'))
+    if event is not None:
+        return f"event: {event}\n{lines}\n"
+    return f"{lines}\n"
+
+
+@app.route('/messages/stream', methods=['POST'])
+def handle_quote_stream():
+    """
+    Streaming variant of POST /messages. Emits the roast as Server-Sent
+    Events while tokens arrive from Bedrock, so the client can render
+    text within first-token latency instead of waiting for the full
+    completion, then stores the finished quote in the background.
+    """
+    logging.debug("Received POST request for /messages/stream")
+
+    if not request.is_json:
+        logging.warning("Request is not JSON. Returning 400.")
+        return jsonify(error="Request must be JSON"), 400
+
+    data = request.get_json()
+    try:
+        name, input1, input2, input3 = _parse_quote_request(data)
+    except ValueError as bad_field:
+        logging.warning("Invalid or missing field '%s' in POST request. "
+                        "Returning 400.", bad_field)
+        return jsonify(error="All fields (name, input1, input2, "
+                             "input3) are required non-empty strings"), 400
+
+    content_hash = _content_hash(name, input1, input2, input3)
+    duplicate = _recent_post_get(content_hash)
+    cache_key = _quote_cache_key(name, input1, input2, input3)
+    quote_id = _new_quote_id()
+    current_timestamp = g.now_ns // 1_000_000_000
+
+    def generate():
+        chunks = []
+        try:
+            cached_quote = (duplicate['quote'] if duplicate is not None
+                            else _quote_cache_get(cache_key))
+            if cached_quote is not None:
+                logging.debug("Streaming cached quote; skipping Bedrock.")
+                chunks.append(cached_quote)
+                yield _sse_frame(cached_quote)
+            else:
+                prompt_tail = _build_prompt_tail(name, input1, input2,
+                                                 input3)
+                for text in _stream_quote_deltas(prompt_tail):
+                    chunks.append(text)
+                    yield _sse_frame(text)
+        except Exception as e:
+            logging.exception("Error while streaming quote: %s", e)
+            yield _sse_frame('The LLM is unavailable', event='error')
+            return
+
+        generated_quote = ''.join(chunks)
+        if not generated_quote:
+            logging.error("Unexpected response structure from Bedrock. "
+                          "No text deltas were streamed.")
+            yield _sse_frame('Unexpected LLM response', event='error')
+            return
+
+        # Duplicates reuse the already-stored item; everything else is
+        # persisted in the background so the stream can close as soon
+        # as the last token is out.
+        if duplicate is None:
+            _quote_cache_put(cache_key, generated_quote)
+            item = {
+                'id': quote_id,
+                'name': name,
+                'quote': generated_quote,
+                'type': 'quote',
+                'timestamp': current_timestamp,
+                'content_hash': content_hash,
+                'reactions': dict(_ZERO_REACTIONS)
+            }
+            put_future = _io_pool.submit(table.put_item, Item=item)
+            put_future.add_done_callback(functools.partial(
+                _after_quote_put,
+                quote_id=quote_id,
+                content_hash=content_hash,
+                stored={'id': quote_id, 'name': name,
+                        'quote': generated_quote}
+            ))
+            yield _sse_frame(quote_id, event='done')
+        else:
+            yield _sse_frame(duplicate['id'], event='done')
+
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream')
+
+
+@app.route('/messages/bulk', methods=['POST'])
+def handle_bulk_quotes():
+    """
+    Internal bulk-import endpoint for backfills and migrations. Accepts
+    pre-generated quotes (no LLM call) and writes them through
+    DynamoDB's batch writer, which chunks requests into 25-item
+    BatchWriteItem calls and automatically resends UnprocessedItems —
+    roughly an order of magnitude faster than per-item put_item.
+
+    Only enabled when BULK_IMPORT_TOKEN is set, and callers must echo
+    the token in the X-Bulk-Import-Token header.
+    """
+    logging.debug("Received bulk POST request for /messages/bulk")
+    if not _BULK_IMPORT_TOKEN:
+        # Not configured on this deployment; don't advertise it.
+        return jsonify(error="Not Found"), 404
+    if not _bulk_import_authorized():
+        logging.warning("Bulk request without a valid import token. "
+                        "Returning 403.")
+        return jsonify(error="Forbidden"), 403
+    try:
+        if not request.is_json:
+            logging.warning("Request is not JSON. Returning 400.")
+            return jsonify(error="Request must be JSON"), 400
+
+        data = request.get_json()
+        raw_items = data.get('items')
+        if not isinstance(raw_items, list) or not raw_items:
+            logging.warning("Bulk request without a non-empty 'items' "
+                            "list. Returning 400.")
+            return jsonify(error="'items' must be a non-empty list"), 400
+        if len(raw_items) > _MAX_BULK_ITEMS:
+            logging.warning("Bulk request with %s items exceeds the "
+                            "limit of %s. Returning 400.",
+                            len(raw_items), _MAX_BULK_ITEMS)
+            return jsonify(
+                error=f"'items' may contain at most {_MAX_BULK_ITEMS} "
+                      "entries"
+            ), 400
+
+        now = g.now_ns // 1_000_000_000
+        try:
+            items = [_parse_bulk_entry(entry, now)
+                     for entry in raw_items]
+        except ValueError as e:
+            logging.warning("Invalid bulk item: %s. Returning 400.", e)
+            return jsonify(error=str(e)), 400
+
+        # Throttling during large imports is absorbed by the adaptive
+        # retry mode on the shared client config.
+        with table.batch_writer(overwrite_by_pkeys=['id']) as batch:
+            for item in items:
+                batch.put_item(Item=item)
+
+        logging.debug("Bulk-stored %s quotes in DynamoDB.", len(items))
+        _feed_cache_invalidate()
+        return jsonify(
+            message=f"Stored {len(items)} quotes",
+            count=len(items)
+        ), 201
+
+    except ClientError as e:
+        logging.exception(
+            "DynamoDB ClientError during bulk POST request: %s", e
+        )
+        return jsonify(
+            error="Failed to store quotes due to DynamoDB error"
+        ), 500
+    except Exception as e:
+        logging.exception(
+            "Unhandled exception during bulk POST request: %s", e
+        )
+        return jsonify(error="Failed to store quotes"), 500
+
+
 @app.route('/messages/<string:quote_id>/react', methods=['PUT', 'OPTIONS'])
 def handle_react(quote_id):
     """
@@ -239,14 +1095,15 @@ def handle_react(quote_id):
     Includes logic to automatically delete a quote if it receives more than
     10 reports.
     """
-    logging.info("Received PUT request for /messages/%s/react", quote_id)
-
     if request.method == 'OPTIONS':
         # This block handles the preflight request explicitly, if needed.
         # However, the CORS(app) initialization should handle this.
-        # This is a safe fallback to ensure the request succeeds.
+        # It runs before any logging or JSON parsing so the frequent
+        # browser preflights cost as little as possible.
         return '', 204
 
+    logging.debug("Received PUT request for /messages/%s/react", quote_id)
+
     try:
         if not request.is_json:
             logging.warning("Request is not JSON. Returning 400.")
@@ -259,46 +1116,51 @@ def handle_react(quote_id):
             logging.warning("Reaction name is missing. Returning 400.")
             return jsonify(error="Reaction name is required"), 400
 
-        # --- FIX FOR BACKWARD COMPATIBILITY & AUTO-DELETE LOGIC ---
-        # This new logic handles items that are missing the 'reactions' map.
-        # It uses a two-step update to ensure the map exists before trying to
-        # update a nested attribute within it.
+        if reaction_name not in _ALLOWED_REACTIONS:
+            logging.warning("Rejected unknown reaction '%s'. "
+                            "Returning 400.", reaction_name)
+            return jsonify(error="Invalid reaction name"), 400
+
+        # --- SINGLE-ROUND-TRIP UPSERT & AUTO-DELETE LOGIC ---
+        # The increment and the existence check happen in one update,
+        # conditioned on the item itself rather than the reactions map,
+        # so ConditionalCheckFailedException now unambiguously means
+        # the quote does not exist (-> 404). Only legacy items written
+        # before the 'reactions' map existed take a second round trip,
+        # surfaced as a ValidationException on the nested path.
         try:
-            # First, try to increment the counter directly. This works for new
-            # quotes or old quotes that already have the 'reactions' map.
-            response = table.update_item(
-                Key={'id': quote_id},
-                UpdateExpression='ADD #reactions.#reaction_name :val',
-                ConditionExpression='attribute_exists(#reactions)',
+            response = ddb_client.update_item(
+                TableName=DYNAMODB_TABLE_NAME,
+                Key={'id': {'S': quote_id}},
+                UpdateExpression=_REACT_UPDATE_EXPR,
+                ConditionExpression='attribute_exists(id)',
                 ExpressionAttributeNames={
                     '#reactions': 'reactions',
                     '#reaction_name': reaction_name
                 },
-                ExpressionAttributeValues={
-                    ':val': 1
-                },
+                ExpressionAttributeValues=_REACT_ONE,
                 ReturnValues='ALL_NEW'
             )
         except ClientError as e:
-            # If the reactions map does not exist, the first update will fail
-            # with a ConditionalCheckFailedException. This is where we handle
-            # old items.
-            if (e.response['Error']['Code'] ==
-                    'ConditionalCheckFailedException'):
-                logging.info(
+            if e.response['Error']['Code'] == 'ValidationException':
+                logging.debug(
                     "Reaction map missing for quote ID '%s', "
                     "attempting to create it...", quote_id)
-                # Now, perform a second update that creates the 'reactions' map
-                # and sets the first reaction count.
-                response = table.update_item(
-                    Key={'id': quote_id},
-                    UpdateExpression='SET #reactions = :initial_map',
-                    ConditionExpression='attribute_not_exists(#reactions)',
+                # Create the map with the first count; if_not_exists
+                # keeps this idempotent if another request created the
+                # map in the meantime.
+                response = ddb_client.update_item(
+                    TableName=DYNAMODB_TABLE_NAME,
+                    Key={'id': {'S': quote_id}},
+                    UpdateExpression=_REACT_INIT_EXPR,
+                    ConditionExpression='attribute_exists(id)',
                     ExpressionAttributeNames={
                         '#reactions': 'reactions'
                     },
                     ExpressionAttributeValues={
-                        ':initial_map': {reaction_name: 1}
+                        ':initial_map': {
+                            'M': {reaction_name: {'N': '1'}}
+                        }
                     },
                     ReturnValues='ALL_NEW'
                 )
@@ -307,12 +1169,14 @@ def handle_react(quote_id):
                 raise e
 
         # --- AUTO-DELETE LOGIC: Check and delete if too many reports ---
-        updated_attributes = response.get('Attributes', {})
+        updated_attributes = _deserialize_item(
+            response.get('Attributes', {}))
         if (reaction_name == 'report' and
                 updated_attributes.get('reactions', {}).get('report', 0) > 10):
             logging.info("Quote with ID '%s' received more than 10 reports. "
                          "Deleting...", quote_id)
-            table.delete_item(Key={'id': quote_id})
+            ddb_client.delete_item(TableName=DYNAMODB_TABLE_NAME,
+                                   Key={'id': {'S': quote_id}})
             logging.info("Quote with ID '%s' successfully deleted from "
                          "DynamoDB.", quote_id)
             return jsonify(
@@ -321,25 +1185,24 @@ def handle_react(quote_id):
 
         # --- END OF FIX ---
 
-        logging.info("Successfully updated reaction '%s' for quote ID '%s'.",
-                     reaction_name, quote_id)
-        return jsonify(response['Attributes']), 200
+        logging.debug("Successfully updated reaction '%s' for quote ID "
+                      "'%s'.", reaction_name, quote_id)
+        return jsonify(updated_attributes), 200
 
     except ClientError as e:
         if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
             logging.error("Quote with ID '%s' not found.", quote_id)
             return jsonify(error="Quote not found"), 404
         else:
-            logging.error(
+            logging.exception(
                 "DynamoDB ClientError during reaction update: %s", e
             )
-            traceback.print_exc()
             return jsonify(
                 error="Failed to update reaction due to DynamoDB error"
             ), 500
     except Exception as e:
-        logging.error("Unhandled exception during reaction update: %s", e)
-        traceback.print_exc()
+        logging.exception("Unhandled exception during reaction update: %s",
+                          e)
         return jsonify(error="Failed to update reaction"), 500
 
 
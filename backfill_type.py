@@ -0,0 +1,106 @@
+"""
+One-shot backfill for the 'quote-by-time' GSI.
+
+Items written before the GSI existed carry no 'type' attribute, so
+DynamoDB never projects them into the index and they vanish from the
+GET /messages feed once the index-backed query replaces the legacy
+scan. This script stamps type='quote' onto every quote item that is
+missing it, after which the GSI query sees the full history.
+
+The scan is split across parallel segments (same pattern as the app's
+legacy fallback) and each item gets a conditional UpdateItem rather
+than a PutItem, so concurrent reaction updates are never clobbered and
+re-running the script is a cheap no-op.
+
+Run once against the live table, e.g. from a one-off pod or CodeBuild
+step with the usual env vars:
+
+    DYNAMODB_TABLE_NAME=... AWS_REGION=... python backfill_type.py
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(message)s',
+)
+
+DYNAMODB_TABLE_NAME = os.environ.get('DYNAMODB_TABLE_NAME',
+                                     'ugp-eks-cicd-messages-table')
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+_SCAN_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '8'))
+
+_BOTO_CONFIG = Config(
+    region_name=AWS_REGION,
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+)
+
+dynamodb = boto3.resource('dynamodb', config=_BOTO_CONFIG)
+table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+
+
+def _scan_untyped_segment(segment):
+    """Returns the ids of quote items in one scan segment that are
+    missing the 'type' attribute."""
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': _SCAN_SEGMENTS,
+        'FilterExpression': (Attr('quote').exists()
+                             & Attr('type').not_exists()),
+        'ProjectionExpression': 'id',
+    }
+    ids = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        ids.extend(item['id'] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return ids
+
+
+def _stamp_type(quote_id):
+    """Adds type='quote' to one item unless it already has a type.
+
+    The condition makes the update idempotent and keeps it from racing
+    anything written by the app after the scan started.
+    """
+    try:
+        table.update_item(
+            Key={'id': quote_id},
+            UpdateExpression='SET #t = :quote',
+            ConditionExpression='attribute_not_exists(#t)',
+            ExpressionAttributeNames={'#t': 'type'},
+            ExpressionAttributeValues={':quote': 'quote'},
+        )
+        return True
+    except ClientError as e:
+        code = e.response['Error']['Code']
+        if code == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def main():
+    logging.info("Scanning '%s' for quote items missing 'type'...",
+                 DYNAMODB_TABLE_NAME)
+    with ThreadPoolExecutor(max_workers=_SCAN_SEGMENTS) as pool:
+        segment_ids = pool.map(_scan_untyped_segment,
+                               range(_SCAN_SEGMENTS))
+        ids = [i for seg in segment_ids for i in seg]
+        logging.info("Found %s item(s) to backfill.", len(ids))
+        stamped = sum(pool.map(_stamp_type, ids))
+    logging.info("Backfill complete: %s updated, %s already typed.",
+                 stamped, len(ids) - stamped)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for the production container.
+
+The handlers spend almost all of their time waiting on Bedrock and
+DynamoDB, so gevent workers are used: each process can overlap many
+in-flight requests instead of serializing one request per worker. The
+gevent worker class monkey-patches the stdlib before the app module is
+imported, so botocore's sockets yield cooperatively during TLS reads.
+"""
+import multiprocessing
+import os
+
+bind = '0.0.0.0:5000'
+# multiprocessing.cpu_count() sees the whole EKS node, not the pod's
+# cgroup CPU limit, so the chart should set WEB_CONCURRENCY to match
+# the pod's resources; the cpu_count formula is only the bare-metal
+# fallback.
+workers = int(os.environ.get('WEB_CONCURRENCY',
+                             multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gevent'
+# Keep worker_connections <= max_pool_connections on the shared boto3
+# Config (64) so concurrent greenlets don't queue on the HTTP pool.
+worker_connections = 64
+keepalive = 75
+timeout = 60